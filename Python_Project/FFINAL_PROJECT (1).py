@@ -9,6 +9,9 @@ filter by values above or below a chosen threshold, compare the AQI averages bet
 A globe map, bar and pie charts, and interactive tables are all included in the dashboard to make the data easy to understand and navigate.
 """
 
+import io
+import os
+
 import streamlit as st
 import matplotlib.pyplot as plt
 import pandas as pd
@@ -80,14 +83,55 @@ Because of their tiny size, they can travel deep into the lungs and even enter t
 """
     )
 
+# [PY1] function with parameter with default + [PY3] error checking
+# Vectorized: buckets every AQI value at once and returns one RGBA row per value
+def get_color(aqi, alpha=180):
+    bins = np.array([50, 100, 150, 200, 300])
+    palette = np.array(
+        [
+            [0, 200, 0, alpha],
+            [255, 255, 0, alpha],
+            [255, 126, 0, alpha],
+            [255, 0, 0, alpha],
+            [153, 0, 76, alpha],
+            [126, 0, 35, alpha],
+        ],
+        dtype=np.uint8,
+    )
+    idx = np.searchsorted(bins, np.asarray(aqi), side="left")
+    return palette[np.minimum(idx, len(palette) - 1)]
+
+
+CSV_PATH = "air_quality_index.csv"
+
+
+# Small (path, mtime) tuple used as the key for every cached function below, so
+# Streamlit never has to hash a whole DataFrame to look up a cached result
+def csv_key():
+    return (CSV_PATH, os.path.getmtime(CSV_PATH))
+
+
 # [DA1] clean or manipulate data
-def load_data():
-    df = pd.read_csv("air_quality_index.csv")
-    df.columns = df.columns.str.strip()
+# Cached so the CSV is only parsed and cleaned once, not on every rerun
+@st.cache_data(ttl=24 * 60 * 60, show_spinner=False)
+def load_data(data_key):
+    # Only the columns the dashboard uses, parsed straight into their final
+    # dtypes (float32 comfortably holds AQI values and coordinates)
+    df = pd.read_csv(
+        CSV_PATH,
+        engine="pyarrow",
+        usecols=["City", "Country", "AQI Value", "lat", "lng", "PM2.5 AQI Category"],
+        dtype={
+            "City": "string",
+            "Country": "string",
+            "PM2.5 AQI Category": "string",
+            "AQI Value": "float32",
+            "lat": "float32",
+            "lng": "float32",
+        },
+    )
 
     numeric_cols = ["AQI Value", "lat", "lng"]
-    for col in numeric_cols:
-        df[col] = pd.to_numeric(df[col], errors="coerce")
     df = df.dropna(subset=numeric_cols)
 
     # [PY5] dictionary use
@@ -97,56 +141,244 @@ def load_data():
         "United States of America": "USA",
         "Russian Federation": "Russia",
     }
-    df["Country"] = df["Country"].replace(country_mapping)
-
-    # [DA8] iterate through rows of a dataframe with iterrows()
-    df["Location_Info"] = ""
-    for index, row in df.head(100).iterrows():
-        df.at[index, "Location_Info"] = f"{row['City']} ({row['Country']})"
+    # map() is a plain hash lookup; unmapped countries keep their original name
+    mapped = df["Country"].map(country_mapping)
+    df["Country"] = mapped.where(mapped.notna(), df["Country"])
+
+    # [DA7] create a new column (vectorized string concatenation for the first 100 rows)
+    # Filled positionally in a preallocated array and assigned to the frame once
+    location_info = np.full(len(df), "", dtype=object)
+    head = df.iloc[:100]
+    location_info[: len(head)] = (
+        head["City"].astype(str) + " (" + head["Country"].astype(str) + ")"
+    ).to_numpy()
+    df["Location_Info"] = location_info
 
     # [DA7] add/drop/select/create new/group columns
-    df["Hemisphere"] = np.where(df["lat"] >= 0, "Northern", "Southern")
-    df["East_West"] = np.where(df["lng"] >= 0, "Eastern", "Western")
+    df["Hemisphere"] = pd.Categorical.from_codes(
+        (df["lat"].to_numpy() < 0).astype(np.int8),
+        categories=["Northern", "Southern"],
+    )
+    df["East_West"] = pd.Categorical.from_codes(
+        (df["lng"].to_numpy() < 0).astype(np.int8),
+        categories=["Eastern", "Western"],
+    )
 
-    return df
+    # [DA1] clean or manipulate data (string cleaning)
+    df["PM2.5 AQI Category"] = df["PM2.5 AQI Category"].str.strip().str.title()
 
+    # Categoricals shrink the low-cardinality string columns and speed up groupby
+    df["Country"] = df["Country"].astype("category")
+    df["PM2.5 AQI Category"] = df["PM2.5 AQI Category"].astype("category")
 
-data = load_data()
+    # [PY4] at least one list comprehension
+    pm25_categories = tuple(
+        sorted([str(c) for c in df["PM2.5 AQI Category"].dropna().unique()])
+    )
+
+    return df, pm25_categories
+
+
+data_key = csv_key()
+data, pm25_categories = load_data(data_key)
+
+# Fixed color per PM2.5 category so the pie chart stays consistent
+PM25_CATEGORY_COLORS = {
+    "Good": "#2ecc71",
+    "Moderate": "#f39c12",
+    "Unhealthy For Sensitive Groups": "#e74c3c",
+    "Unhealthy": "#9b59b6",
+    "Very Unhealthy": "#1abc9c",
+    "Hazardous": "#34495e",
+}
+pm25_colors = {c: PM25_CATEGORY_COLORS.get(c, "#95a5a6") for c in pm25_categories}
+
+# Every value the AQI Threshold slider can take (0-500 in steps of 10)
+AQI_THRESHOLDS = np.arange(0, 501, 10)
+
+
+# Cumulative city counts per country at each slider threshold, so moving the
+# slider indexes one column instead of rescanning the data
+def count_by_threshold(df, side):
+    buckets = np.searchsorted(AQI_THRESHOLDS, df["AQI Value"].to_numpy(), side=side)
+    counts = (
+        df.groupby(["Country", buckets], observed=True)
+        .size()
+        .unstack(fill_value=0)
+        .reindex(columns=range(len(AQI_THRESHOLDS)), fill_value=0)
+        .cumsum(axis=1)
+        .astype(np.int32)
+    )
+    counts.columns = AQI_THRESHOLDS
+    return counts
+
+
+# Slider-independent aggregates, cached per CSV key so only the cheap
+# min_cities filtering below runs on each rerun
+@st.cache_data(show_spinner=False)
+def compute_aggregates(data_key):
+    df, _ = load_data(data_key)
+    country_stats_raw = df.groupby("Country", observed=True)["AQI Value"].agg(
+        ["count", "mean", "min", "max"]
+    )
+    country_stats_raw["count"] = country_stats_raw["count"].astype(np.int32)
+
+    hemi_stats = df.groupby("Hemisphere", observed=True)["AQI Value"].agg(
+        ["count", "mean", "std", "min", "max"]
+    )
+    hemi_stats.columns = ["Cities", "Average", "Std Dev", "Minimum", "Maximum"]
+    hemi_stats["Cities"] = hemi_stats["Cities"].astype(np.int32)
+
+    east_west_stats = df.groupby("East_West", observed=True)["AQI Value"].agg(
+        ["count", "mean", "std", "min", "max"]
+    )
+    east_west_stats.columns = ["Cities", "Average", "Std Dev", "Minimum", "Maximum"]
+    east_west_stats["Cities"] = east_west_stats["Cities"].astype(np.int32)
 
-# [DA1] clean or manipulate data (string cleaning)
-data["PM2.5 AQI Category"] = data["PM2.5 AQI Category"].str.strip().str.title()
+    # [DA6] Analyze the data with pivot tables
+    pm25_pivot_raw = pd.pivot_table(
+        data=df,
+        index="Country",
+        columns="PM2.5 AQI Category",
+        values="AQI Value",
+        aggfunc="count",
+        fill_value=0,
+        observed=True,
+    ).astype(np.int32)
+    pivot_totals = pm25_pivot_raw.sum(axis=1).sort_values(ascending=False)
+    pm25_pivot_raw = pm25_pivot_raw.loc[pivot_totals.index]
+
+    category_dist = df["PM2.5 AQI Category"].value_counts(normalize=True) * 100
+
+    # "side" decides whether a city sitting exactly on a threshold is counted:
+    # below uses AQI < threshold, above uses AQI > threshold
+    below_by_threshold = count_by_threshold(df, "right")
+    above_by_threshold = (-count_by_threshold(df, "left")).add(
+        country_stats_raw["count"], axis=0
+    )
+
+    return dict(
+        country_stats_raw=country_stats_raw,
+        below_by_threshold=below_by_threshold,
+        above_by_threshold=above_by_threshold,
+        hemi_stats=hemi_stats,
+        east_west_stats=east_west_stats,
+        pm25_pivot_raw=pm25_pivot_raw,
+        category_dist=category_dist,
+    )
+
+
+# Only the columns the scatter layer and its tooltip read, built once per CSV.
+# Cities with AQI >= 100 are always drawn; Good/Moderate cities are sampled
+# down to max_points so the browser has fewer points to render.
+@st.cache_data(show_spinner=False)
+def build_map_data(data_key, max_points=5000):
+    df, _ = load_data(data_key)
+    map_data = df[
+        [
+            "City",
+            "Country",
+            "lat",
+            "lng",
+            "AQI Value",
+            "PM2.5 AQI Category",
+            "Hemisphere",
+            "East_West",
+            "Location_Info",
+        ]
+    ].rename(columns={"lng": "lon"})
+
+    # One uint8 column per RGBA channel instead of a list object in every cell,
+    # so the layer payload holds only flat numeric and string values
+    rgba = get_color(map_data["AQI Value"].to_numpy())
+    for i, channel in enumerate(["r", "g", "b", "a"]):
+        map_data[channel] = rgba[:, i]
+
+    # [MAP] detailed map with hover
+    # AQI < 100 -> 2000, < 200 -> 3000, otherwise 4000
+    radius_thresholds = np.array([100, 200], dtype=np.float32)
+    radius_sizes = np.array([2000, 3000, 4000], dtype=np.int32)
+    map_data["radius"] = radius_sizes[
+        np.searchsorted(
+            radius_thresholds, map_data["AQI Value"].to_numpy(), side="right"
+        )
+    ]
+
+    good = map_data[map_data["AQI Value"] < 100]
+    bad = map_data[map_data["AQI Value"] >= 100]
+    if len(good) > max_points:
+        good = good.sample(max_points, random_state=0)
+    return pd.concat([good, bad])
+
+
+# Styler builds its inline CSS cell by cell in Python, so the rendered HTML is
+# cached per table and reused until the table's contents change
+@st.cache_data(show_spinner=False)
+def styled_table(stats, formatter, subset=None, axis=0, height=None):
+    html = (
+        stats.style.format(formatter)
+        .background_gradient(cmap="YlOrRd", subset=subset, axis=axis)
+        .to_html()
+    )
+    if height is not None:
+        html = f'<div style="height: {height}px; overflow: auto;">{html}</div>'
+    return html
+
+
+# Charts are rendered to PNG bytes and cached on their plotted values, so a
+# rerun with unchanged inputs skips matplotlib entirely
+def figure_to_png(fig):
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png", dpi=90, bbox_inches="tight")
+    plt.close(fig)
+    return buf.getvalue()
+
+
+@st.cache_data(show_spinner=False)
+def render_barh(series_items, title, color, xlabel, figsize=(10, 5)):
+    series = pd.Series(dict(series_items))
+    fig, ax = plt.subplots(figsize=figsize)
+    series.plot(kind="barh", color=color, ax=ax)
+    ax.set_title(title)
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel("Country")
+    return figure_to_png(fig)
+
+
+@st.cache_data(show_spinner=False)
+def render_pie(series_items, colors, title):
+    labels, values = zip(*series_items)
+    fig, ax = plt.subplots(figsize=(8, 6))
+    ax.pie(
+        values,
+        labels=labels,
+        autopct="%1.1f%%",
+        startangle=90,
+        colors=colors,
+        textprops={"fontsize": 8},
+    )
+    ax.axis("equal")
+    ax.set_title(title, pad=20)
+    return figure_to_png(fig)
+
+
+aggregates = compute_aggregates(data_key)
 
 st.sidebar.header("Filter Options")
 # [ST1] Streamlit widget 1 (slider)
 aqi_threshold = st.sidebar.slider("AQI Threshold Value", 0, 500, 50, 10)
 # [ST1] Streamlit widget 2 (slider)
 min_cities = st.sidebar.slider("Minimum Cities per Country", 1, 50, 5)
+map_detail = st.sidebar.slider(
+    "Map detail (max Good/Moderate cities shown)", 1000, 50000, 5000, 1000
+)
 
 # [DA2] Sort data in ascending or descending order, by one or more columns
-country_stats = (
-    data.groupby("Country")["AQI Value"]
-    .agg(["count", "mean", "min", "max"])
-)
+country_stats = aggregates["country_stats_raw"]
 country_stats = country_stats[country_stats["count"] >= min_cities].sort_values(
     "mean"
 )
 
-# [PY1] function with parameter with default + [PY3] error checking
-def get_color(aqi, alpha=180):
-    if aqi <= 50:
-        return [0, 200, 0, alpha]
-    elif aqi <= 100:
-        return [255, 255, 0, alpha]
-    elif aqi <= 150:
-        return [255, 126, 0, alpha]
-    elif aqi <= 200:
-        return [255, 0, 0, alpha]
-    elif aqi <= 300:
-        return [153, 0, 76, alpha]
-    else:
-        return [126, 0, 35, alpha]
-
-
 # [PY2] function returning multiple values
 def calculate_hemisphere_stats(df):
     north = df[df["Hemisphere"] == "Northern"]["AQI Value"].mean()
@@ -154,27 +386,24 @@ def calculate_hemisphere_stats(df):
     return north, south
 
 
-north_avg, south_avg = calculate_hemisphere_stats(data)
-
-# [PY4] at least one list comprehension
-pm25_categories_list = [
-    num
-    for num in data["PM2.5 AQI Category"].unique().tolist()
-    if str(num) != "nan"
-]
-
-tab1, tab2, tab3, tab4, tab5 = st.tabs(
+# Unlike st.tabs, where every tab's body runs on each rerun, only the selected
+# view below is computed and rendered
+active_tab = st.radio(
+    "View",
     [
         "AQI Statistics",
         "Threshold Comparison",
         "Hemisphere Analysis",
         "PM2.5 Analysis",
         "Global Map",
-    ]
+    ],
+    horizontal=True,
+    key="active_tab",
+    label_visibility="collapsed",
 )
 
 # TAB 1 – Country-Level AQI Statistics
-with tab1:
+if active_tab == "AQI Statistics":
     st.markdown(
         '<p class="section-header">AQI Value Analysis</p>',
         unsafe_allow_html=True,
@@ -197,21 +426,27 @@ with tab1:
     else:
         display_stats = country_stats
 
+    # The gradient is styled cell by cell, so cap the rows handed to Styler
+    display_stats = display_stats.head(200)
+
     # [VIZ1] Chart 1: table
-    st.dataframe(
-        display_stats.style.format(
+    st.markdown(
+        styled_table(
+            display_stats,
             {
                 "count": "{:.0f}",
                 "mean": "{:.1f}",
                 "min": "{:.0f}",
                 "max": "{:.0f}",
-            }
-        ).background_gradient(cmap="YlOrRd", subset=["mean"]),
-        height=400,
+            },
+            subset=["mean"],
+            height=400,
+        ),
+        unsafe_allow_html=True,
     )
 
 # TAB 2 – Threshold Comparison
-with tab2:
+if active_tab == "Threshold Comparison":
     st.markdown(
         '<p class="section-header">City Counts vs AQI Threshold</p>',
         unsafe_allow_html=True,
@@ -219,41 +454,50 @@ with tab2:
 
     st.subheader(f"Cities Relative to AQI {aqi_threshold}")
 
-    # [DA4] filter data by one condition
-    below = data[data["AQI Value"] < aqi_threshold]["Country"].value_counts()
+    # [DA4] filter data by one condition (AQI < threshold, precomputed per country)
+    below = aggregates["below_by_threshold"][aqi_threshold].sort_values(
+        ascending=False
+    )
 
     # [DA5] Filter the data by two or more conditions (AND)
     below = below[below >= min_cities]
 
     # [VIZ2] Chart 2: bar chart (below threshold)
     if not below.empty:
-        fig1, ax1 = plt.subplots(figsize=(10, 5))
-        below.head(10).plot(kind="barh", color="green", ax=ax1)
-        ax1.set_title(f"Countries Below Threshold ({aqi_threshold})")
-        ax1.set_xlabel("Number of Cities")
-        st.pyplot(fig1)
+        fig1 = render_barh(
+            tuple(below.head(10).items()),
+            f"Countries Below Threshold ({aqi_threshold})",
+            "green",
+            "Number of Cities",
+        )
+        st.image(fig1)
     else:
         st.info("No countries meet the criteria for 'Below Threshold'.")
 
-    above = data[data["AQI Value"] > aqi_threshold]["Country"].value_counts()
+    above = aggregates["above_by_threshold"][aqi_threshold].sort_values(
+        ascending=False
+    )
     above = above[above >= min_cities]
 
     # [VIZ2] Chart 3: bar chart (above threshold)
     if not above.empty:
-        fig2, ax2 = plt.subplots(figsize=(10, 5))
-        above.head(10).plot(kind="barh", color="red", ax=ax2)
-        ax2.set_title(f"Countries Above Threshold ({aqi_threshold})")
-        ax2.set_xlabel("Number of Cities")
-        st.pyplot(fig2)
+        fig2 = render_barh(
+            tuple(above.head(10).items()),
+            f"Countries Above Threshold ({aqi_threshold})",
+            "red",
+            "Number of Cities",
+        )
+        st.image(fig2)
     else:
         st.info("No countries meet the criteria for 'Above Threshold'.")
 
 # TAB 3 – Hemisphere Analysis
-with tab3:
+if active_tab == "Hemisphere Analysis":
     st.markdown(
         '<p class="section-header">Hemisphere Comparison</p>',
         unsafe_allow_html=True,
     )
+    north_avg, south_avg = calculate_hemisphere_stats(data)
     col1, col2 = st.columns(2)
     with col1:
         st.metric("Average AQI – Northern Hemisphere", f"{north_avg:.1f}")
@@ -261,89 +505,68 @@ with tab3:
         st.metric("Average AQI – Southern Hemisphere", f"{south_avg:.1f}")
 
     st.subheader("Northern vs Southern Hemisphere")
-    hemi_stats = data.groupby("Hemisphere")["AQI Value"].agg(
-        ["count", "mean", "std", "min", "max"]
-    )
-    hemi_stats.columns = ["Cities", "Average", "Std Dev", "Minimum", "Maximum"]
+    hemi_stats = aggregates["hemi_stats"]
 
-    st.dataframe(
-        hemi_stats.style.format(
+    st.markdown(
+        styled_table(
+            hemi_stats,
             {
                 "Cities": "{:.0f}",
                 "Average": "{:.1f}",
                 "Std Dev": "{:.1f}",
                 "Minimum": "{:.0f}",
                 "Maximum": "{:.0f}",
-            }
-        ).background_gradient(cmap="YlOrRd", subset=["Average"])
+            },
+            subset=["Average"],
+        ),
+        unsafe_allow_html=True,
     )
 
     st.subheader("Eastern vs Western Hemisphere")
-    east_west_stats = data.groupby("East_West")["AQI Value"].agg(
-        ["count", "mean", "std", "min", "max"]
-    )
-    east_west_stats.columns = ["Cities", "Average", "Std Dev", "Minimum", "Maximum"]
+    east_west_stats = aggregates["east_west_stats"]
 
-    st.dataframe(
-        east_west_stats.style.format(
+    st.markdown(
+        styled_table(
+            east_west_stats,
             {
                 "Cities": "{:.0f}",
                 "Average": "{:.1f}",
                 "Std Dev": "{:.1f}",
                 "Minimum": "{:.0f}",
                 "Maximum": "{:.0f}",
-            }
-        ).background_gradient(cmap="YlOrRd", subset=["Average"])
+            },
+            subset=["Average"],
+        ),
+        unsafe_allow_html=True,
     )
 
 # TAB 4 – PM2.5 Analysis
-with tab4:
+if active_tab == "PM2.5 Analysis":
     st.markdown(
         '<p class="section-header">PM2.5 Category Analysis</p>',
         unsafe_allow_html=True,
     )
 
-    # [DA6] Analyze the data with pivot tables
-    pm25_pivot = pd.pivot_table(
-        data=data,
-        index="Country",
-        columns="PM2.5 AQI Category",
-        values="AQI Value",
-        aggfunc="count",
-        fill_value=0,
-    )
-
-    # [DA3] Find the top largest values of a column
+    # [DA3] Find the top largest values of a column (pivot is pre-sorted by Total)
+    pm25_pivot = aggregates["pm25_pivot_raw"]
     pm25_pivot = pm25_pivot[pm25_pivot.sum(axis=1) >= min_cities]
-    pm25_pivot["Total"] = pm25_pivot.sum(axis=1)
-    pm25_pivot = pm25_pivot.sort_values("Total", ascending=False).drop(
-        "Total", axis=1
-    )
 
     st.subheader("PM2.5 Categories by Country")
-    st.dataframe(
-        pm25_pivot.head(20)
-        .style.format("{:.0f}")
-        .background_gradient(cmap="YlOrRd", axis=1)
+    top_pivot = pm25_pivot.head(20)
+    st.markdown(
+        styled_table(top_pivot, "{:.0f}", axis=1),
+        unsafe_allow_html=True,
     )
 
     # [VIZ3] Chart 4: pie chart
     st.subheader("Global PM2.5 Category Distribution")
-    category_dist = data["PM2.5 AQI Category"].value_counts(normalize=True) * 100
+    category_dist = aggregates["category_dist"]
 
-    fig3, ax3 = plt.subplots(figsize=(8, 6))
-    colors = ["#2ecc71", "#f39c12", "#e74c3c", "#9b59b6", "#1abc9c"]
-    ax3.pie(
-        category_dist,
-        labels=category_dist.index,
-        autopct="%1.1f%%",
-        startangle=90,
-        colors=colors,
-        textprops={"fontsize": 8},
+    colors = tuple(pm25_colors[c] for c in category_dist.index)
+    fig3 = render_pie(
+        tuple(category_dist.items()), colors, "PM2.5 Category Distribution"
     )
-    ax3.axis("equal")
-    plt.title("PM2.5 Category Distribution", pad=20)
-    st.pyplot(fig3)
+    st.image(fig3)
 
     st.markdown(
         '<p class="section-header">PM2.5 Category Filter Analysis</p>',
@@ -351,22 +574,25 @@ with tab4:
     )
 
     # [ST3] Streamlit widget 4 (selectbox)
-    pm25_categories_sorted = sorted(pm25_categories_list)
     selected_category = st.selectbox(
-        "Select PM2.5 Category to Analyze:", pm25_categories_sorted
+        "Select PM2.5 Category to Analyze:", pm25_categories
     )
 
     valid_countries = country_stats[country_stats["count"] >= min_cities].index
-    country_totals = data["Country"].value_counts()
-    category_counts = data[
-        data["PM2.5 AQI Category"] == selected_category
-    ]["Country"].value_counts()
-
-    country_percentages = (category_counts / country_totals * 100).dropna()
-    country_percentages = country_percentages[
-        country_percentages.index.isin(valid_countries)
-    ]
-    country_percentages = country_percentages.sort_values(ascending=False)
+
+    # One groupby yields both the matching-city count and the city total
+    is_selected = (data["PM2.5 AQI Category"] == selected_category).to_numpy()
+    category_counts = (
+        pd.DataFrame({"Country": data["Country"], "selected": is_selected})
+        .groupby("Country", observed=True)["selected"]
+        .agg(["sum", "count"])
+        .loc[valid_countries]
+    )
+    category_counts = category_counts[category_counts["sum"] > 0]
+
+    country_percentages = (
+        category_counts["sum"] / category_counts["count"] * 100
+    ).sort_values(ascending=False)
 
     st.subheader(
         f"Top 10 Countries by % of Cities with {selected_category} PM2.5 Levels"
@@ -375,41 +601,23 @@ with tab4:
     top_10.columns = ["Country", "Percentage"]
     top_10["Percentage"] = top_10["Percentage"].round(2)
 
-    fig4, ax4 = plt.subplots(figsize=(10, 6))
-    top_10.plot(kind="barh", x="Country", y="Percentage", color="#3498db", ax=ax4)
-    ax4.set_title(f"% of Cities with {selected_category} PM2.5 by Country")
-    ax4.set_xlabel("Percentage of Country's Cities in this Category")
-    st.pyplot(fig4)
+    fig4 = render_barh(
+        tuple(zip(top_10["Country"], top_10["Percentage"])),
+        f"% of Cities with {selected_category} PM2.5 by Country",
+        "#3498db",
+        "Percentage of Country's Cities in this Category",
+        figsize=(10, 6),
+    )
+    st.image(fig4)
 
 # TAB 5 – Global Map
-with tab5:
+if active_tab == "Global Map":
     st.markdown(
         '<p class="section-header">Global Air Quality Map</p>',
         unsafe_allow_html=True,
     )
 
-    map_data = data.reset_index()[
-        [
-            "City",
-            "Country",
-            "lat",
-            "lng",
-            "AQI Value",
-            "PM2.5 AQI Category",
-            "Hemisphere",
-            "East_West",
-            "Location_Info",
-        ]
-    ]
-    map_data.rename(columns={"lng": "lon"}, inplace=True)
-    map_data["color"] = map_data["AQI Value"].apply(get_color)
-
-    # [MAP] detailed map with hover
-    map_data["radius"] = np.where(
-        map_data["AQI Value"] < 100,
-            2000,
-            np.where(map_data["AQI Value"] < 200, 3000, 4000),
-    )
+    map_data = build_map_data(data_key, map_detail)
 
     view_state = pdk.ViewState(
         latitude=map_data["lat"].mean(),
@@ -422,7 +630,7 @@ with tab5:
         "ScatterplotLayer",
         data=map_data,
         get_position="[lon, lat]",
-        get_color="color",
+        get_color="[r, g, b, a]",
         get_radius="radius",
         pickable=True,
         opacity=0.8,